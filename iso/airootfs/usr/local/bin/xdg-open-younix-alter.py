@@ -5,13 +5,14 @@ import subprocess
 from pathlib import Path
 import configparser
 import mimetypes
+from ylib.desktop_catalog import get_catalog, strip_field_codes
 
 # Paths
 CONFIG_FILE = Path.home() / ".config" / "mimeapps.list"
 DESKTOP_DIRS = [
-    Path("/usr/share/applications"),
-    Path("/usr/local/share/applications"),
-    Path.home() / ".local/share/applications"
+    "/usr/share/applications",
+    "/usr/local/share/applications",
+    str(Path.home() / ".local/share/applications")
 ]
 
 def read_mimeapps():
@@ -31,27 +32,15 @@ def read_mimeapps():
 
 def find_desktop_file(name):
     """Return full path of .desktop file"""
-    for d in DESKTOP_DIRS:
-        path = d / name
-        if path.exists():
-            return path
-    return None
+    path = get_catalog(DESKTOP_DIRS).find(name)
+    return Path(path) if path else None
 
 def parse_desktop_exec(desktop_file):
     """Return Exec command from a .desktop file"""
     try:
-        lines = desktop_file.read_text().splitlines()
-        in_entry = False
-        for line in lines:
-            if line.strip() == "[Desktop Entry]":
-                in_entry = True
-            elif line.startswith("[") and in_entry:
-                break
-            elif in_entry and line.startswith("Exec="):
-                exec_cmd = line.split("=", 1)[1].strip()
-                for code in ['%U', '%F', '%u', '%f', '%i', '%c', '%k']:
-                    exec_cmd = exec_cmd.replace(code, '')
-                return exec_cmd.split()
+        entry = get_catalog(DESKTOP_DIRS).get_path(desktop_file)
+        if entry and entry['exec']:
+            return strip_field_codes(entry['exec']).split()
     except Exception:
         pass
     return None
@@ -0,0 +1,276 @@
+"""
+Ranked fuzzy search over launcher entries.
+
+Names are folded (lower case, accents stripped) and split into words
+once, when the index is built; a keystroke only scores the candidates.
+A query matches when it is a subsequence of the folded name, and scores
+higher the more structured the match is: exact name, name prefix, word
+prefix, prefixes of successive words ("lo" -> LibreOffice,
+"vsc" -> Visual Studio Code), substring, and finally scattered letters.
+
+Apps whose name does not match can still be found through their
+Keywords, GenericName, Comment and Categories: build_keyword_index()
+turns those into a {token: [app id]} inverted index that is stored with
+the launcher catalog, and a query looks up each of its words there, so a
+multi-word query costs a few set intersections. Keyword matches always
+rank below name matches.
+
+Every kind of match of a query also matches any shorter prefix of it, so
+when the query grows by appending characters only the previous results
+are searched again.
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+
+# CamelCase and digit runs start new words: "LibreOffice" -> libre, office
+WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+|[^\W\d_]+")
+
+SCORE_EXACT = 1000
+SCORE_PREFIX = 900
+SCORE_WORD_PREFIX = 800
+SCORE_WORD_INITIALS = 700
+SCORE_SUBSTRING = 500
+SCORE_SUBSEQUENCE = 200
+SCORE_KEYWORD = 0  # below every name match
+
+KEYWORD_FIELDS = ('keywords', 'generic_name', 'comment', 'categories')
+STOP_WORDS = frozenset(["an", "and", "the", "for", "of", "on", "in", "to", "with", "your", "you", "or", "by"])
+
+
+def fold(text):
+    """Lower-case text and strip accents, so "Émile" and "emile" compare equal"""
+    text = unicodedata.normalize('NFKD', text)
+    return "".join(c for c in text if not unicodedata.combining(c)).casefold()
+
+
+def split_words(text):
+    return [fold(word) for word in WORD_RE.findall(unicodedata.normalize('NFC', text))]
+
+
+def match_word_prefixes(query, words, start=0):
+    """Return how many words are skipped when query is made of prefixes of
+    successive words (in order, each at least one character), or None"""
+    if not query:
+        return 0
+    best = None
+    for i in range(start, len(words)):
+        word = words[i]
+        if word[0] != query[0]:
+            continue
+        # try the longest prefix of this word first; shorter ones leave more for the next words
+        n = 1
+        while n < len(word) and n < len(query) and word[n] == query[n]:
+            n += 1
+        for length in range(n, 0, -1):
+            rest = match_word_prefixes(query[length:], words, i + 1)
+            if rest is not None:
+                skipped = (i - start) + rest
+                if best is None or skipped < best:
+                    best = skipped
+                break
+        if best == 0:
+            break
+    return best
+
+
+def subsequence_gaps(query, text):
+    """Return the number of characters skipped when query is a subsequence of text, or None"""
+    pos = text.find(query[0])
+    if pos < 0:
+        return None
+    gaps = 0
+    for c in query[1:]:
+        found = text.find(c, pos + 1)
+        if found < 0:
+            return None
+        gaps += found - pos - 1
+        pos = found
+    return gaps
+
+
+def keyword_tokens(app):
+    """Return the folded search tokens of an app's keyword fields"""
+    tokens = set()
+    for field in KEYWORD_FIELDS:
+        value = app.get(field) or ''
+        if isinstance(value, list):
+            value = " ".join(value)
+        # split_words also splits Categories such as AudioVideo
+        tokens.update(word for word in split_words(value) if len(word) > 1 and word not in STOP_WORDS)
+    return tokens
+
+
+def build_keyword_index(apps):
+    """Return {token: [app id, ...]} over the keyword fields of {app id: app}"""
+    index = {}
+    for app_id, app in apps.items():
+        for token in keyword_tokens(app):
+            index.setdefault(token, []).append(app_id)
+    return {token: sorted(ids) for token, ids in sorted(index.items())}
+
+
+class SearchEntry:
+    __slots__ = ('position', 'name', 'words', 'chars')
+
+    def __init__(self, position, name):
+        self.position = position
+        self.name = fold(name)
+        self.words = split_words(name) or [self.name]
+        self.chars = frozenset(self.name)
+
+
+def score_entry(query, entry):
+    """Score one entry for a folded, non-empty query; None when it does not match"""
+    name = entry.name
+    if name == query:
+        return SCORE_EXACT
+    if name.startswith(query):
+        return SCORE_PREFIX - min(len(name) - len(query), 99)
+    for i, word in enumerate(entry.words):
+        if word.startswith(query):
+            return SCORE_WORD_PREFIX - min(i, 99)
+    # spaces in the query only separate words: "libre off" is libre + off
+    skipped = match_word_prefixes(query.replace(" ", ""), entry.words)
+    if skipped is not None:
+        return SCORE_WORD_INITIALS - min(skipped * 10, 190)
+    pos = name.find(query)
+    if pos >= 0:
+        return SCORE_SUBSTRING - min(pos, 199)
+    gaps = subsequence_gaps(query, name) if " " not in query else None
+    if gaps is not None:
+        return SCORE_SUBSEQUENCE - min(gaps, 199)
+    return None
+
+
+class SearchIndex:
+    """Search the names of a list of items, returning their positions best first.
+
+    keys are the item ids used by keyword_index (see build_keyword_index);
+    without them only names are searched.
+    """
+
+    def __init__(self, names, keys=None, keyword_index=None):
+        self.entries = [SearchEntry(i, name) for i, name in enumerate(names)]
+        self.keys = list(keys) if keys else []
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        self.keyword_index = keyword_index or {}
+        self.tokens = sorted(self.keyword_index)
+        self.last_query = ""
+        self.last_matches = self.entries
+
+    def move(self, source, destination):
+        """Move the item at position source to position destination, renumbering only the items in between"""
+        self.entries.insert(destination, self.entries.pop(source))
+        if self.keys:
+            self.keys.insert(destination, self.keys.pop(source))
+        for i in range(min(source, destination), max(source, destination) + 1):
+            self.entries[i].position = i
+            if self.keys:
+                self.positions[self.keys[i]] = i
+        self.last_query, self.last_matches = "", self.entries
+
+    def keyword_matches(self, query):
+        """Return the positions of the items with a token starting with each query word"""
+        if not self.positions:
+            return set()
+        ids = None
+        for word in query.split():
+            # every token the word is a prefix of, so results appear while typing
+            found = set()
+            i = bisect_left(self.tokens, word)
+            while i < len(self.tokens) and self.tokens[i].startswith(word):
+                found.update(self.keyword_index[self.tokens[i]])
+                i += 1
+            ids = found if ids is None else ids & found
+            if not ids:
+                return set()
+        return {self.positions[key] for key in ids if key in self.positions}
+
+    def search(self, query):
+        """Return the positions of the matching items, best match first.
+
+        Ties keep the original item order, so equally good matches stay in
+        the user's arrangement.
+        """
+        query = fold(query).strip()
+        if not query:
+            self.last_query, self.last_matches = "", self.entries
+            return [entry.position for entry in self.entries]
+
+        # narrow incrementally: a longer query can only match a subset of the previous results
+        if self.last_query and query.startswith(self.last_query):
+            candidates = self.last_matches
+        else:
+            candidates = self.entries
+        chars = set(query) - {" "}
+        keyword_positions = self.keyword_matches(query)
+
+        scored = []
+        matches = []
+        for entry in candidates:
+            score = score_entry(query, entry) if chars <= entry.chars else None
+            if score is None and entry.position in keyword_positions:
+                score = SCORE_KEYWORD
+            if score is not None:
+                matches.append(entry)
+                scored.append((-score, len(entry.name), entry.position))
+
+        self.last_query, self.last_matches = query, matches
+        scored.sort()
+        return [position for _, _, position in scored]
+
+
+def benchmark(count=1000, rounds=20):
+    """Time typing queries one character at a time over count generated names"""
+    import random
+    import time
+
+    random.seed(1)
+    words = ["Libre", "Office", "Visual", "Studio", "Code", "Writer", "Calc", "Draw", "Terminal",
+             "Files", "Image", "Viewer", "Editor", "Player", "Music", "Video", "Settings", "Manager",
+             "System", "Monitor", "Network", "Printer", "Disk", "Usage", "Analyzer", "Text", "Web",
+             "Browser", "Mail", "Client", "Chat", "Photo", "Paint", "Sound", "Recorder", "Café",
+             "Über", "Notes", "Calendar", "Clock", "Weather", "Maps", "Archive", "Backup"]
+    names = [" ".join(random.sample(words, random.randint(1, 3))) for _ in range(count)]
+    names[:3] = ["LibreOffice Writer", "Visual Studio Code", "Firefox"]
+    keywords = ["spreadsheet", "pdf", "browser", "internet", "audio", "video", "office", "graphics",
+                "development", "editor", "network", "game", "utility", "settings", "viewer", "email"]
+    apps = {str(i): {'keywords': random.sample(keywords, 3), 'categories': ["AudioVideo", "Utility"]}
+            for i in range(count)}
+    keys = [str(i) for i in range(count)]
+    queries = ["vsc", "lo", "libreoffice", "writer", "termnal", "settings manager", "cafe", "zz",
+               "browser", "pdf viewer"]
+
+    start = time.perf_counter()
+    keyword_index = build_keyword_index(apps)
+    print(f"keyword index {count} apps: {(time.perf_counter() - start) * 1000:.2f} ms")
+    start = time.perf_counter()
+    SearchIndex(names, keys, keyword_index)
+    print(f"index {count} names: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    for query in queries:
+        fresh = typed = 0.0
+        for _ in range(rounds):
+            index = SearchIndex(names, keys, keyword_index)
+            start = time.perf_counter()
+            results = index.search(query)
+            fresh += time.perf_counter() - start
+            start = time.perf_counter()
+            for n in range(1, len(query) + 1):
+                index.search(query[:n])
+            typed += time.perf_counter() - start
+        top = names[results[0]] if results else "-"
+        print(f"{query!r:20} {len(results):5} matches  full query {fresh / rounds * 1000:6.2f} ms  "
+              f"per keystroke {typed / rounds / len(query) * 1000:6.2f} ms  top: {top}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        index = SearchIndex([line.strip() for line in sys.stdin if line.strip()])
+        for query in sys.argv[1:]:
+            print(query, [index.entries[p].name for p in index.search(query)[:10]])
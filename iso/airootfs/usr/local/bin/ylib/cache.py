@@ -0,0 +1,33 @@
+import json
+import os
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".cache" / "younix"
+
+
+def cache_path(name):
+    """Return the path of a cache file under ~/.cache/younix"""
+    return CACHE_DIR / name
+
+
+def load_json(path, default=None):
+    """Read a JSON cache file, returning default if it is missing or corrupt"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path, data):
+    """Write a JSON cache file atomically (write to a temp file, then rename)"""
+    path = Path(path)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        return False
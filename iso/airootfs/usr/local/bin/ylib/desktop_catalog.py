@@ -0,0 +1,242 @@
+"""
+Shared catalog of parsed .desktop files.
+
+Every desktop file is parsed once into a plain dict of the fields its
+consumers read (not the raw keys, most of which are translations) and
+kept in ~/.cache/younix/desktop-catalog.json together with its mtime and size,
+so later lookups from ylauncher, ydock and xdg-open-younix only need a
+stat() to confirm the cached entry is still current.
+"""
+import atexit
+import os
+from pathlib import Path
+
+from ylib.cache import cache_path, load_json, save_json
+
+DESKTOP_DIRS = [
+    "/usr/share/applications",
+    str(Path.home() / ".local/share/applications"),
+]
+FIELD_CODES = ['%U', '%F', '%u', '%f', '%i', '%c', '%k']
+
+CATALOG_FILE = cache_path("desktop-catalog.json")
+CATALOG_VERSION = 2
+
+
+def current_locales():
+    """Return the locale keys to try for localized values, most specific first"""
+    lang = os.environ.get('LC_MESSAGES') or os.environ.get('LANG', 'en')
+    lang = lang.split('.')[0].split('@')[0]
+    locales = [lang]
+    if '_' in lang:
+        locales.append(lang.split('_')[0])
+    return locales
+
+
+def split_list(value):
+    """Split a ';' separated desktop entry list, dropping empty items"""
+    return [item for item in value.split(';') if item] if value else []
+
+
+def is_true(value):
+    return (value or '').lower() in ('true', '1', 'yes')
+
+
+def strip_field_codes(exec_cmd):
+    """Remove desktop entry field codes (%U, %f, ...) from an Exec line"""
+    for code in FIELD_CODES:
+        exec_cmd = exec_cmd.replace(code, '')
+    return exec_cmd
+
+
+def localized(keys, key, locales=None):
+    """Return keys['key[locale]'] for the current locale, falling back to keys['key']"""
+    for locale in locales or current_locales():
+        value = keys.get(f"{key}[{locale}]")
+        if value:
+            return value
+    return keys.get(key, '')
+
+
+def localized_map(keys, key):
+    """Return {locale: value} for every localized variant of a key"""
+    prefix = key + '['
+    return {k[len(prefix):-1]: v for k, v in keys.items() if k.startswith(prefix) and k.endswith(']')}
+
+
+def read_sections(filepath):
+    """Parse a desktop file into {section name: {key: value}}"""
+    sections = {}
+    current = None
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                current = sections.setdefault(line[1:-1], {})
+                continue
+            if current is None or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            key = key.strip()
+            # first occurrence wins, like the parsers this replaces
+            if key not in current:
+                current[key] = value.strip()
+    return sections
+
+
+def parse_desktop_file(filepath):
+    """Parse a desktop file into a catalog entry dict, or None if it has no [Desktop Entry]"""
+    sections = read_sections(filepath)
+    keys = sections.get('Desktop Entry')
+    if keys is None:
+        return None
+
+    actions = []
+    for action_id in split_list(keys.get('Actions', '')):
+        action_keys = sections.get(f'Desktop Action {action_id}')
+        if action_keys is None:
+            continue
+        actions.append({
+            'id': action_id,
+            'name': action_keys.get('Name', action_id),
+            'names': localized_map(action_keys, 'Name'),
+            'exec': action_keys.get('Exec', ''),
+            'icon': action_keys.get('Icon', ''),
+        })
+
+    return {
+        'id': os.path.basename(filepath),
+        'path': str(filepath),
+        'type': keys.get('Type', ''),
+        'name': keys.get('Name', ''),
+        'names': localized_map(keys, 'Name'),
+        'generic_name': keys.get('GenericName', ''),
+        'comment': keys.get('Comment', ''),
+        'exec': keys.get('Exec', ''),
+        'try_exec': keys.get('TryExec', ''),
+        'icon': keys.get('Icon', ''),
+        'startup_wm_class': keys.get('StartupWMClass', ''),
+        'no_display': is_true(keys.get('NoDisplay')),
+        'hidden': is_true(keys.get('Hidden')),
+        'terminal': is_true(keys.get('Terminal')),
+        'keywords': split_list(keys.get('Keywords', '')),
+        'categories': split_list(keys.get('Categories', '')),
+        'mime_types': split_list(keys.get('MimeType', '')),
+        'actions': actions,
+    }
+
+
+def display_name(entry, locales=None):
+    """Return the entry name for the current locale"""
+    for locale in locales or current_locales():
+        if entry['names'].get(locale):
+            return entry['names'][locale]
+    return entry['name']
+
+
+class DesktopCatalog:
+    def __init__(self, dirs=None, cache_file=CATALOG_FILE):
+        self.dirs = list(dirs or DESKTOP_DIRS)
+        self.cache_file = cache_file
+        self.files = None
+        self.dirty = False
+
+    def _load(self):
+        data = load_json(self.cache_file)
+        if isinstance(data, dict) and data.get('version') == CATALOG_VERSION:
+            self.files = data.get('files', {})
+        else:
+            self.files = {}
+
+    def save(self):
+        """Write the catalog back to disk if anything was (re)parsed"""
+        if not self.dirty or self.files is None:
+            return
+        # keep entries another tool cached for directories this catalog does not cover
+        data = load_json(self.cache_file)
+        files = {}
+        if isinstance(data, dict) and data.get('version') == CATALOG_VERSION:
+            files = {p: v for p, v in data.get('files', {}).items() if os.path.dirname(p) not in self.dirs}
+        files.update(self.files)
+        if save_json(self.cache_file, {'version': CATALOG_VERSION, 'files': files}):
+            self.dirty = False
+
+    def get_path(self, filepath):
+        """Return the entry for a desktop file path, re-parsing only if its mtime or size changed"""
+        if self.files is None:
+            self._load()
+        filepath = str(filepath)
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            if self.files.pop(filepath, None) is not None:
+                self.dirty = True
+            return None
+
+        cached = self.files.get(filepath)
+        if cached and cached['mtime'] == st.st_mtime_ns and cached['size'] == st.st_size:
+            return cached['entry']
+
+        try:
+            entry = parse_desktop_file(filepath)
+        except OSError:
+            entry = None
+        self.files[filepath] = {'mtime': st.st_mtime_ns, 'size': st.st_size, 'entry': entry}
+        self.dirty = True
+        return entry
+
+    def find(self, desktop_id):
+        """Return the path of a desktop file id in the first directory that has it"""
+        for d in self.dirs:
+            path = os.path.join(d, desktop_id)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def get(self, desktop_id):
+        """Return the entry for a desktop file id (e.g. 'firefox.desktop')"""
+        path = self.find(desktop_id)
+        return self.get_path(path) if path else None
+
+    def scan(self):
+        """Return the entries of every .desktop file in the catalog directories, in directory order"""
+        if self.files is None:
+            self._load()
+        entries = []
+        seen = set()
+        for d in self.dirs:
+            try:
+                names = os.listdir(d)
+            except OSError:
+                continue
+            for name in names:
+                if not name.endswith('.desktop'):
+                    continue
+                path = os.path.join(d, name)
+                seen.add(path)
+                entry = self.get_path(path)
+                if entry:
+                    entries.append(entry)
+
+        # forget files that disappeared from the scanned directories
+        for path in list(self.files):
+            if os.path.dirname(path) in self.dirs and path not in seen:
+                del self.files[path]
+                self.dirty = True
+        self.save()
+        return entries
+
+
+_catalogs = {}
+
+
+def get_catalog(dirs=None):
+    """Return a shared catalog for a list of directories; it is saved at exit"""
+    key = tuple(dirs or DESKTOP_DIRS)
+    if key not in _catalogs:
+        catalog = DesktopCatalog(key)
+        atexit.register(catalog.save)
+        _catalogs[key] = catalog
+    return _catalogs[key]
@@ -0,0 +1,172 @@
+"""
+Fake Hyprland instance for exercising ylib.hyprland without a compositor.
+
+Serves .socket.sock (JSON queries, dispatch, [[BATCH]]) and .socket2.sock
+(event stream) from a temporary runtime directory:
+
+    with FakeHyprland() as hypr:
+        hypr.clients.append({"address": "0x1", "class": "foot", ...})
+        ipc = HyprlandIPC(hypr.request_path)
+        ipc.dispatch("focuswindow", "address:0x1")
+        assert hypr.dispatched == ["focuswindow address:0x1"]
+        hypr.emit("openwindow>>1,1,foot,Terminal")
+
+Run it as 'python3 -m ylib.fake_hyprland' to get an interactive instance;
+export the printed HYPRLAND_INSTANCE_SIGNATURE and XDG_RUNTIME_DIR before
+starting ydock against it.
+"""
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+
+from ylib.hyprland import REQUEST_SOCKET, EVENT_SOCKET, BATCH_SEPARATOR
+
+
+class FakeHyprland:
+    def __init__(self, signature="fake"):
+        self.signature = signature
+        self.runtime_dir = tempfile.mkdtemp(prefix="fake-hypr-")
+        self.instance_dir = os.path.join(self.runtime_dir, "hypr", signature)
+        os.makedirs(self.instance_dir)
+        self.request_path = os.path.join(self.instance_dir, REQUEST_SOCKET)
+        self.event_path = os.path.join(self.instance_dir, EVENT_SOCKET)
+
+        self.clients = []
+        self.workspaces = [{"id": 1, "name": "1"}]
+        self.active_workspace = {"id": 1, "name": "1"}
+        self.active_window = {}
+        self.requests = []
+        self.dispatched = []
+        self.event_clients = []
+        # stalled: read requests but never answer them, to exercise client timeouts
+        self.stalled = False
+        self.stalled_conns = []
+        # drop_events: close every socket2 connection as soon as it is accepted,
+        # like a stale socket while the compositor restarts
+        self.drop_events = False
+        self.event_connections = 0
+        self._lock = threading.Lock()
+        self._servers = []
+
+    def start(self):
+        self._servers.append(self._listen(self.request_path, self._serve_request))
+        self._servers.append(self._listen(self.event_path, self._serve_events))
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.close()
+        with self._lock:
+            for conn in self.event_clients + self.stalled_conns:
+                conn.close()
+            self.event_clients = []
+            self.stalled_conns = []
+        shutil.rmtree(self.runtime_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def env(self):
+        """Environment that points ylib.hyprland.socket_path() at this instance"""
+        return {"HYPRLAND_INSTANCE_SIGNATURE": self.signature, "XDG_RUNTIME_DIR": self.runtime_dir}
+
+    def emit(self, *lines):
+        """Push raw 'event>>data' lines to every connected socket2 reader"""
+        self.emit_raw("".join(line + "\n" for line in lines).encode('utf-8'))
+
+    def emit_raw(self, data):
+        """Push bytes as they are, e.g. half an event line"""
+        with self._lock:
+            for conn in list(self.event_clients):
+                try:
+                    conn.sendall(data)
+                except OSError:
+                    self.event_clients.remove(conn)
+
+    def disconnect_events(self):
+        """Drop every socket2 reader, as a compositor restart would"""
+        with self._lock:
+            for conn in self.event_clients:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                conn.close()
+            self.event_clients = []
+
+    def _listen(self, path, handler):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(16)
+
+        def accept_loop():
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except OSError:
+                    return
+                handler(conn)
+
+        threading.Thread(target=accept_loop, daemon=True).start()
+        return server
+
+    def _serve_events(self, conn):
+        self.event_connections += 1
+        if self.drop_events:
+            conn.close()
+            return
+        with self._lock:
+            self.event_clients.append(conn)
+
+    def _serve_request(self, conn):
+        try:
+            command = conn.recv(65536).decode('utf-8')
+            self.requests.append(command)
+            if self.stalled:
+                with self._lock:
+                    self.stalled_conns.append(conn)
+                return
+            if command.startswith("[[BATCH]]"):
+                replies = [self.reply(c.strip()) for c in command[len("[[BATCH]]"):].split(";")]
+                conn.sendall(BATCH_SEPARATOR.join(replies).encode('utf-8'))
+            else:
+                conn.sendall(self.reply(command).encode('utf-8'))
+        finally:
+            if conn not in self.stalled_conns:
+                conn.close()
+
+    def reply(self, command):
+        """Answer one request the way Hyprland would"""
+        if command.startswith("j/"):
+            command = command[2:]
+        if command.startswith("dispatch "):
+            self.dispatched.append(command[len("dispatch "):])
+            return "ok"
+        queries = {
+            "clients": self.clients,
+            "workspaces": self.workspaces,
+            "activeworkspace": self.active_workspace,
+            "activewindow": self.active_window,
+        }
+        if command in queries:
+            return json.dumps(queries[command])
+        return "unknown request"
+
+
+if __name__ == "__main__":
+    import time
+
+    hypr = FakeHyprland().start()
+    for key, value in hypr.env().items():
+        print(f"export {key}={value}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        hypr.stop()
@@ -0,0 +1,295 @@
+"""
+Minimal in-process client for Hyprland's IPC sockets.
+
+Talks to the request socket (.socket.sock) directly instead of forking
+hyprctl: one short-lived connection per request, JSON queries via the
+'j/' flag, dispatchers and '[[BATCH]]' multi-command requests.
+
+EventReader follows the event socket (.socket2.sock) on a background
+thread: a buffered line reader that survives chunk boundaries, parses
+lines into Event tuples, reconnects with backoff when the compositor goes
+away and hands events to the caller in batches.
+"""
+import glob
+import json
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+
+REQUEST_SOCKET = ".socket.sock"
+EVENT_SOCKET = ".socket2.sock"
+DEFAULT_TIMEOUT = 1.0
+BATCH_SEPARATOR = "\n\n\n"
+
+RECV_SIZE = 65536
+RECONNECT_MIN_DELAY = 0.25
+RECONNECT_MAX_DELAY = 10.0
+
+# Number of comma separated fields per event; the last field may contain commas
+EVENT_FIELDS = {
+    "openwindow": 4,
+    "closewindow": 1,
+    "movewindow": 2,
+    "movewindowv2": 3,
+    "activewindow": 2,
+    "activewindowv2": 1,
+    "windowtitle": 1,
+    "windowtitlev2": 2,
+    "urgent": 1,
+    "workspace": 1,
+    "workspacev2": 2,
+    "focusedmon": 2,
+    "createworkspacev2": 2,
+    "destroyworkspacev2": 2,
+}
+
+# received is the time.monotonic() at which the line was read off the socket,
+# so consumers can measure latency without counting their own main-loop backlog
+Event = namedtuple("Event", ["name", "data", "args", "received"], defaults=[None])
+
+
+class HyprlandError(Exception):
+    pass
+
+
+def runtime_dirs():
+    """Return the directories Hyprland may keep its instance sockets in"""
+    dirs = []
+    xdg_runtime = os.environ.get('XDG_RUNTIME_DIR') or f"/run/user/{os.getuid()}"
+    dirs.append(os.path.join(xdg_runtime, "hypr"))
+    # Hyprland < 0.40 used /tmp/hypr
+    dirs.append("/tmp/hypr")
+    return dirs
+
+
+def socket_path(name=REQUEST_SOCKET, signature=None):
+    """Return the path of a Hyprland socket, or None if no instance is running"""
+    signature = signature or os.environ.get('HYPRLAND_INSTANCE_SIGNATURE')
+    if signature:
+        for d in runtime_dirs():
+            path = os.path.join(d, signature, name)
+            if os.path.exists(path):
+                return path
+
+    # Fallback: find any Hyprland socket
+    for d in runtime_dirs():
+        sockets = glob.glob(os.path.join(d, "*", name))
+        if sockets:
+            return sockets[0]
+    return None
+
+
+class HyprlandIPC:
+    def __init__(self, path=None, timeout=DEFAULT_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+
+    def _socket_path(self):
+        if not self.path or not os.path.exists(self.path):
+            self.path = socket_path(REQUEST_SOCKET)
+        if not self.path:
+            raise HyprlandError("Hyprland request socket not found")
+        return self.path
+
+    def request(self, command):
+        """Send one raw request and return the full text reply"""
+        path = self._socket_path()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(path)
+            sock.sendall(command.encode('utf-8'))
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except OSError as e:
+            # a stale cached path is re-resolved on the next request
+            self.path = None
+            raise HyprlandError(f"{command!r}: {e}") from e
+        finally:
+            sock.close()
+        return b"".join(chunks).decode('utf-8', errors='replace')
+
+    def query(self, name):
+        """Run a JSON query such as 'clients' or 'activeworkspace'"""
+        reply = self.request(f"j/{name}")
+        try:
+            return json.loads(reply)
+        except ValueError as e:
+            raise HyprlandError(f"{name}: invalid JSON reply: {reply[:80]!r}") from e
+
+    def dispatch(self, *args):
+        """Run a dispatcher; returns True when Hyprland answers 'ok'"""
+        reply = self.request("dispatch " + " ".join(str(a) for a in args))
+        return reply.strip() == "ok"
+
+    def batch(self, commands):
+        """Run several commands in one round-trip and return their replies in order"""
+        if not commands:
+            return []
+        reply = self.request("[[BATCH]]" + ";".join(commands))
+        replies = reply.split(BATCH_SEPARATOR)
+        # some Hyprland versions terminate the last reply with the separator too
+        while len(replies) > len(commands) and not replies[-1].strip():
+            replies.pop()
+        return replies
+
+    def clients(self):
+        return self.query("clients")
+
+    def active_workspace(self):
+        return self.query("activeworkspace")
+
+    def active_window(self):
+        return self.query("activewindow")
+
+    def workspaces(self):
+        return self.query("workspaces")
+
+
+def parse_event(line, received=None):
+    """Parse one 'name>>data' socket2 line into an Event, or None if malformed"""
+    name, sep, data = line.partition(">>")
+    if not sep or not name:
+        return None
+    fields = EVENT_FIELDS.get(name)
+    args = tuple(data.split(",", fields - 1)) if fields else (data,)
+    return Event(name, data, args, received)
+
+
+class EventReader:
+    """Follow Hyprland's event socket on a daemon thread.
+
+    deliver(events) receives lists of Event tuples; schedule(callback) is
+    used to run it on the consumer's main loop (e.g. GLib.idle_add), and
+    every event that arrives before that callback runs joins the same
+    batch. on_connect() is scheduled after each (re)connection so the
+    consumer can resync state it may have missed.
+    """
+
+    def __init__(self, deliver, schedule=None, on_connect=None, path=None):
+        self.deliver = deliver
+        self.schedule = schedule or (lambda callback: callback())
+        self.on_connect = on_connect
+        self.path = path
+        self.sock = None
+        self.running = False
+        self.received = False
+        self._pending = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        sock = self.sock
+        if sock:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _connect(self):
+        path = self.path or socket_path(EVENT_SOCKET)
+        if not path:
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(DEFAULT_TIMEOUT)
+            sock.connect(path)
+            sock.settimeout(None)
+        except OSError:
+            sock.close()
+            return None
+        return sock
+
+    def _run(self):
+        delay = RECONNECT_MIN_DELAY
+        while self.running:
+            self.sock = self._connect()
+            if self.sock is None:
+                # compositor not (yet) there: back off, then look for a new instance
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                continue
+            self.received = False
+            if self.on_connect:
+                self.schedule(self._connected)
+            try:
+                self._read(self.sock)
+            except OSError:
+                pass
+            finally:
+                self.sock.close()
+                self.sock = None
+            # only a connection that delivered events resets the backoff; one that is
+            # accepted and closed at once (a stale socket while Hyprland restarts)
+            # must not turn into a busy loop of reconnects and resyncs
+            if self.received:
+                delay = RECONNECT_MIN_DELAY
+            if self.running:
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def _connected(self):
+        self.on_connect()
+        return False
+
+    def _read(self, sock):
+        chunk = bytearray(RECV_SIZE)
+        view = memoryview(chunk)
+        buffer = bytearray()
+        while self.running:
+            n = sock.recv_into(chunk)
+            if not n:
+                return
+            self.received = True
+            received = time.monotonic()
+            buffer += view[:n]
+            end = buffer.rfind(b"\n")
+            if end < 0:
+                continue
+            # only complete lines are parsed; a partial tail waits for the next chunk
+            lines = bytes(buffer[:end]).decode("utf-8", errors="replace").split("\n")
+            del buffer[:end + 1]
+            events = [e for e in (parse_event(line, received) for line in lines) if e]
+            if events:
+                self._queue(events)
+
+    def _queue(self, events):
+        with self._lock:
+            self._pending.extend(events)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.schedule(self._flush)
+
+    def _flush(self):
+        with self._lock:
+            events, self._pending = self._pending, []
+            self._scheduled = False
+        if events:
+            self.deliver(events)
+        return False
+
+
+_default_ipc = None
+
+
+def get_ipc():
+    """Return the process-wide Hyprland client"""
+    global _default_ipc
+    if _default_ipc is None:
+        _default_ipc = HyprlandIPC()
+    return _default_ipc
@@ -0,0 +1,216 @@
+"""
+Persistent icon-theme index.
+
+Maps an icon name to every matching file under the icon search paths,
+built in a single walk and cached in ~/.cache/younix/icon-index.json.
+Each theme directory (every subdirectory of a search path, plus the loose
+files directly in it) is an index unit that is re-walked only when its
+mtime signature changes.
+"""
+import os
+
+from ylib.cache import cache_path, load_json, save_json
+
+SEARCH_PATHS = ["/usr/share/icons", "/usr/share/pixmaps"]
+THEME_PRIORITY = {"breeze-dark": 4, "breeze": 3, "hicolor": 2}
+ICON_EXTENSIONS = (".png", ".svg", ".svgz")
+SCALABLE_SIZE = 9999
+
+INDEX_FILE = cache_path("icon-index.json")
+INDEX_VERSION = 1
+
+
+def theme_score(full_path):
+    """Return the theme priority of an icon path (0 for unknown themes)"""
+    for theme, prio in THEME_PRIORITY.items():
+        if f"/{theme}/" in full_path:
+            return prio
+    return 0
+
+
+def icon_size(full_path):
+    """Extract the nominal size of an icon from its directory names"""
+    parts = full_path.split(os.sep)
+    if "scalable" in parts:
+        return SCALABLE_SIZE
+    for p in parts:
+        if "x" in p:
+            a = p.split("x")[0]
+            if a.isdigit():
+                return int(a)
+        elif p.isdigit():
+            return int(p)
+    return 0
+
+
+def theme_directories(path):
+    """Return the icon directories an index.theme lists, or None without one"""
+    dirs = []
+    section = None
+    try:
+        with open(os.path.join(path, "index.theme"), encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    section = line
+                elif section == "[Icon Theme]" and "=" in line:
+                    key, value = line.split("=", 1)
+                    if key.strip() in ("Directories", "ScaledDirectories"):
+                        dirs.extend(d.strip() for d in value.split(",") if d.strip())
+    except OSError:
+        return None
+    return dirs
+
+
+def unit_signature(path, recursive):
+    """Return the mtime signature used to invalidate one index unit.
+
+    Icon packages rewrite icon-theme.cache through the gtk-update-icon-cache
+    hook, so its mtime changes whenever icons are added deep inside a theme.
+    Themes without a cache fall back to the mtimes of the directories their
+    index.theme lists, or of every directory when there is no index.theme.
+    """
+    try:
+        sig = os.stat(path).st_mtime
+    except OSError:
+        return None
+    if not recursive:
+        return sig
+    try:
+        return max(sig, os.stat(os.path.join(path, "icon-theme.cache")).st_mtime)
+    except OSError:
+        pass
+    dirs = theme_directories(path)
+    if dirs is None:
+        dirs = [root for root, _, _ in os.walk(path)]
+    else:
+        dirs = [os.path.join(path, "index.theme")] + [os.path.join(path, d) for d in dirs]
+    for d in dirs:
+        try:
+            sig = max(sig, os.stat(d).st_mtime)
+        except OSError:
+            pass
+    return sig
+
+
+def scan_unit(path, recursive):
+    """Walk one index unit and return {icon name: [[path, size, theme], ...]}"""
+    icons = {}
+
+    def add(root, files):
+        for f in files:
+            base_name, ext = os.path.splitext(f)
+            if ext.lower() not in ICON_EXTENSIONS:
+                continue
+            full_path = os.path.join(root, f)
+            icons.setdefault(base_name, []).append(
+                [full_path, icon_size(full_path), theme_score(full_path)]
+            )
+
+    if recursive:
+        for root, dirs, files in os.walk(path):
+            add(root, files)
+    else:
+        try:
+            with os.scandir(path) as it:
+                files = [e.name for e in it if not e.is_dir()]
+        except OSError:
+            files = []
+        add(path, files)
+    return icons
+
+
+def list_units():
+    """Return the (path, recursive) units that make up the search paths"""
+    units = []
+    for base in SEARCH_PATHS:
+        if not os.path.isdir(base):
+            continue
+        units.append((base, False))
+        try:
+            with os.scandir(base) as it:
+                for entry in it:
+                    # os.walk never descends into symlinked directories either
+                    if entry.is_dir(follow_symlinks=False):
+                        units.append((entry.path, True))
+        except OSError:
+            continue
+    return units
+
+
+class IconIndex:
+    def __init__(self, index_file=INDEX_FILE):
+        self.index_file = index_file
+        self.icons = None
+        self._best = {}
+
+    def load(self):
+        """Load the cached index and rescan only the stale theme directories"""
+        data = load_json(self.index_file)
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            data = {"version": INDEX_VERSION, "units": {}}
+        cached_units = data.get("units", {})
+
+        units = {}
+        changed = False
+        for path, recursive in list_units():
+            sig = unit_signature(path, recursive)
+            cached = cached_units.get(path)
+            if cached and cached.get("mtime") == sig and cached.get("recursive") == recursive:
+                units[path] = cached
+            else:
+                units[path] = {"mtime": sig, "recursive": recursive, "icons": scan_unit(path, recursive)}
+                changed = True
+        if set(units) != set(cached_units):
+            changed = True
+
+        if changed:
+            save_json(self.index_file, {"version": INDEX_VERSION, "units": units})
+
+        # Merge units in search order so ties resolve like the old os.walk scan
+        merged = {}
+        for unit in units.values():
+            for name, candidates in unit["icons"].items():
+                merged.setdefault(name, []).extend(candidates)
+        self.icons = merged
+        self._best = {}
+        return changed
+
+    def candidates(self, icon_name):
+        """Return all indexed [path, size, theme] entries for an icon name"""
+        if self.icons is None:
+            self.load()
+        return self.icons.get(icon_name, [])
+
+    def find(self, icon_name):
+        """Return the largest icon file for a name, preferring higher-priority themes"""
+        if not icon_name:
+            return None
+        if os.path.isabs(icon_name) and os.path.exists(icon_name):
+            return icon_name
+        if icon_name in self._best:
+            return self._best[icon_name]
+
+        best = None
+        for candidate in self.candidates(icon_name):
+            # strict '>' keeps the first candidate on ties, like a stable sort
+            if best is None or (candidate[1], candidate[2]) > (best[1], best[2]):
+                best = candidate
+        path = best[0] if best else None
+        self._best[icon_name] = path
+        return path
+
+
+_default_index = None
+
+
+def get_icon_index():
+    """Return the process-wide icon index, loading it on first use"""
+    global _default_index
+    if _default_index is None:
+        _default_index = IconIndex()
+    return _default_index
+
+
+def find_icon(icon_name):
+    return get_icon_index().find(icon_name)
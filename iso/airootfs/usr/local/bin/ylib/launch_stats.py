@@ -0,0 +1,123 @@
+"""
+Launch latency histograms.
+
+ydock times every launch from the click to the app's first window and
+records it here, per ISO build and desktop file, as a log-scaled
+histogram: each bucket is 25% wider than the previous one, so p50/p95
+are accurate to within one bucket while the file stays a few counters
+per app no matter how many launches are recorded.
+"""
+import math
+
+from ylib.cache import cache_path, load_json, save_json
+
+STATS_FILE = cache_path("launch-latency.json")
+STATS_VERSION = 1
+
+BUCKET_BASE_MS = 10.0
+BUCKET_GROWTH = 1.25
+MAX_BUCKET = 64  # ~16 minutes; slower "launches" all land here
+
+VERSION_FILES = ["/version", "/etc/os-release"]
+
+
+def build_id():
+    """Return an identifier of the running ISO build"""
+    try:
+        # mkarchiso writes the ISO version to /version
+        with open(VERSION_FILES[0]) as f:
+            version = f.read().strip()
+            if version:
+                return version
+    except OSError:
+        pass
+    try:
+        with open(VERSION_FILES[1]) as f:
+            fields = dict(line.strip().split('=', 1) for line in f if '=' in line)
+        for key in ('IMAGE_VERSION', 'BUILD_ID', 'VERSION_ID'):
+            if fields.get(key):
+                return fields[key].strip('"')
+    except OSError:
+        pass
+    return "unknown"
+
+
+def bucket_index(ms):
+    if ms <= BUCKET_BASE_MS:
+        return 0
+    return min(math.ceil(math.log(ms / BUCKET_BASE_MS, BUCKET_GROWTH)), MAX_BUCKET)
+
+
+def bucket_upper_ms(index):
+    """Upper bound of a bucket, which is what percentiles report"""
+    return BUCKET_BASE_MS * BUCKET_GROWTH ** index
+
+
+def percentile(buckets, p):
+    """Return the p-th percentile in ms of a {bucket index: count} histogram"""
+    total = sum(buckets.values())
+    if not total:
+        return None
+    rank = max(1, math.ceil(p / 100 * total))
+    seen = 0
+    for index in sorted(buckets):
+        seen += buckets[index]
+        if seen >= rank:
+            return bucket_upper_ms(index)
+    return bucket_upper_ms(max(buckets))
+
+
+class LaunchStats:
+    def __init__(self, path=STATS_FILE, build=None):
+        self.path = path
+        self.build = build or build_id()
+        data = load_json(path)
+        if isinstance(data, dict) and data.get('version') == STATS_VERSION:
+            self.builds = data.get('builds', {})
+        else:
+            self.builds = {}
+
+    def histogram(self, app, build=None):
+        """Return {bucket index: count} for one app"""
+        buckets = self.builds.get(build or self.build, {}).get(app, {})
+        return {int(index): count for index, count in buckets.items()}
+
+    def record(self, app, seconds):
+        """Add one launch of app that took seconds until its first window"""
+        buckets = self.builds.setdefault(self.build, {}).setdefault(app, {})
+        index = str(bucket_index(seconds * 1000))
+        buckets[index] = buckets.get(index, 0) + 1
+        # launches are rare, so every one is written through
+        save_json(self.path, {'version': STATS_VERSION, 'builds': self.builds})
+
+    def summary(self, build=None):
+        """Return {app: {'count', 'p50_ms', 'p95_ms'}} for one build"""
+        summary = {}
+        for app in sorted(self.builds.get(build or self.build, {})):
+            buckets = self.histogram(app, build)
+            summary[app] = {
+                'count': sum(buckets.values()),
+                'p50_ms': round(percentile(buckets, 50)),
+                'p95_ms': round(percentile(buckets, 95)),
+            }
+        return summary
+
+    def dump(self):
+        """Return the summaries of every recorded build, current build first"""
+        builds = sorted(self.builds, key=lambda b: b != self.build)
+        return {'current_build': self.build, 'builds': {b: self.summary(b) for b in builds}}
+
+
+def format_ms(ms):
+    return f"{ms:.0f} ms" if ms < 1000 else f"{ms / 1000:.1f} s"
+
+
+_default_stats = None
+
+
+def get_launch_stats():
+    """Return the process-wide launch statistics"""
+    global _default_stats
+    if _default_stats is None:
+        _default_stats = LaunchStats()
+    return _default_stats
@@ -0,0 +1,580 @@
+"""
+ylauncher's catalog of applications and folders.
+
+Stored in SQLite (WAL mode) under ~/.config/ylauncher/launcher.db, one
+row per app, folder, folder membership, sort position and keyword token.
+Every change writes just the rows it touches, inside a transaction, so a
+crash or two 'ylauncher -d' runs at once can no longer leave a truncated
+catalog behind. The detected-apps.json of older versions is imported
+once, the first time the database is opened.
+
+The launcher works on the dict shape the JSON file had, see load().
+Kept free of Qt so 'ylauncher -d' can update the catalog without
+starting the launcher: discover() reconciles it with every desktop file,
+apply_changes() with just the files a watcher reported, e.g.
+
+    ylauncher --discover --changed /usr/share/applications/foo.desktop --event create
+
+Apps are matched through dicts keyed by (name, exec), name and desktop
+file id rather than by scanning the catalog for every desktop file.
+"""
+import json
+import os
+import sqlite3
+import sys
+import uuid
+from contextlib import contextmanager
+
+from ylib.app_search import KEYWORD_FIELDS, keyword_tokens
+from ylib.desktop_catalog import get_catalog
+from ylib.icon_index import get_icon_index
+
+DB_FILE = os.path.expanduser("~/.config/ylauncher/launcher.db")
+JSON_FILE = os.path.expanduser("~/.config/ylauncher/detected-apps.json")
+SCHEMA_VERSION = 1
+
+# sortIds are spread this far apart, so a moved item fits between its new neighbours
+ORDER_GAP = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    exec TEXT,
+    icon TEXT,
+    icon_name TEXT,
+    generic_name TEXT,
+    comment TEXT,
+    keywords TEXT,
+    categories TEXT
+);
+CREATE INDEX IF NOT EXISTS apps_exec ON apps (exec);
+CREATE TABLE IF NOT EXISTS folders (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS membership (
+    app_id TEXT PRIMARY KEY,
+    folder_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS membership_folder ON membership (folder_id);
+CREATE TABLE IF NOT EXISTS item_order (
+    item_id TEXT PRIMARY KEY,
+    sort_id INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    token TEXT NOT NULL,
+    app_id TEXT NOT NULL,
+    PRIMARY KEY (token, app_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS keywords_app ON keywords (app_id);
+"""
+
+# keywords and categories are lists, stored as JSON text
+LIST_FIELDS = ('keywords', 'categories')
+
+# --event values that mean the desktop file went away
+REMOVE_EVENTS = {"delete", "moved_from"}
+
+
+def find_icon(icon_name):
+    # Served from the persistent icon index instead of walking every theme per icon
+    return get_icon_index().find(icon_name)
+
+
+def app_info_from_entry(entry):
+    if entry and entry['name'] and entry['exec'] and not entry['no_display']:
+        # Store the .desktop filename instead of the exec command
+        icon = entry['icon'] or None
+        icon_path = find_icon(icon) if icon else None
+        return {
+            'name': entry['name'],
+            'exec': entry['id'],
+            'icon': icon_path,
+            'icon_name': icon,
+            # searched through the keyword index, see ylib.app_search
+            'generic_name': entry['generic_name'],
+            'comment': entry['comment'],
+            'keywords': entry['keywords'],
+            'categories': entry['categories'],
+        }
+    return None
+
+
+def new_app(app_info, sort_id):
+    app_id = str(uuid.uuid4())
+    app = {
+        "id": app_id,
+        "name": app_info["name"],
+        "exec": app_info["exec"],
+        "icon": app_info["icon"],
+        "icon_name": app_info.get("icon_name"),
+        "folderId": None,
+        "sortId": sort_id
+    }
+    for field in KEYWORD_FIELDS:
+        app[field] = app_info[field]
+    return app
+
+
+def ensure_sort_ids(data):
+    """Ensures all apps and folders have an integer sortId."""
+    max_id = 0
+    items_without_id = []
+    all_items = list(data.get("applications", {}).values()) + list(data.get("folders", {}).values())
+    modified = False
+
+    for item in all_items:
+        sort_id = item.get("sortId")
+        if isinstance(sort_id, int):
+            max_id = max(max_id, sort_id)
+        else:
+            items_without_id.append(item)
+            modified = True  # key is missing or not an int
+
+    if items_without_id:
+        current_id = max_id + 1
+        # Sort by name first to have a predictable initial order for migrated items
+        items_without_id.sort(key=lambda x: x.get("name", "").lower())
+        for item in items_without_id:
+            item["sortId"] = current_id
+            current_id += 1
+
+    return data, modified
+
+
+def sort_id_between(before, after):
+    """Return an integer sortId between two neighbours' (None at either end), or None if they leave no room"""
+    if before is None and after is None:
+        return 0
+    if before is None:
+        return after - ORDER_GAP
+    if after is None:
+        return before + ORDER_GAP
+    if after - before > 1:
+        return (before + after) // 2
+    return None
+
+
+def encode_field(field, value):
+    if field in LIST_FIELDS and value is not None:
+        return json.dumps(value)
+    return value
+
+
+def decode_field(field, value):
+    if field in LIST_FIELDS and value is not None:
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+class LauncherCatalog:
+    def __init__(self, path=DB_FILE, json_path=JSON_FILE):
+        self.path = path
+        self.json_path = json_path
+        self.data = None
+        self.db = None
+        self.version = None
+
+    def connect(self):
+        if self.db is not None:
+            return self.db
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # transactions are explicit, see transaction()
+        self.db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.transaction() as db:
+            if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                for statement in SCHEMA.split(";"):
+                    if statement.strip():
+                        db.execute(statement)
+                self._migrate_json(db)
+                db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        return self.db
+
+    @contextmanager
+    def transaction(self):
+        """Run a block of statements as one write transaction.
+
+        A failed one changes nothing and its error (sqlite3.Error, e.g.
+        "database is locked") reaches the caller, whose in-memory state
+        no longer matches the catalog.
+        """
+        # IMMEDIATE takes the write lock up front, so concurrent writers queue instead of failing halfway
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.db
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        else:
+            self.db.execute("COMMIT")
+
+    def _migrate_json(self, db):
+        """Import detected-apps.json of older versions into a new database"""
+        try:
+            with open(self.json_path, 'r') as f:
+                data = json.load(f)
+            apps = data["applications"]
+            folders = data["folders"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        data, _ = ensure_sort_ids(data)
+        for folder in folders.values():
+            self._write_folder(db, folder)
+        for app in apps.values():
+            if app.get("folderId") not in folders:
+                app["folderId"] = None
+            self._write_app(db, app)
+        # kept next to the database for reference, but never imported again
+        try:
+            os.replace(self.json_path, self.json_path + ".migrated")
+        except OSError:
+            pass
+
+    def changed_on_disk(self):
+        """Return whether another process (e.g. ylauncher -d) changed the catalog since we read it"""
+        try:
+            # data_version only changes for commits made through other connections
+            return self.connect().execute("PRAGMA data_version").fetchone()[0] != self.version
+        except sqlite3.Error:
+            return False
+
+    def load(self, full=False):
+        """Read the catalog into {"applications": {id: app}, "folders": {id: folder}, "keywordIndex": ...}.
+
+        The grid only needs names, icons, folders and order; the keyword
+        fields are only read with full=True (for discovery), the grid gets
+        the stored keyword index instead.
+        """
+        db = self.connect()
+        columns = ["id", "name", "exec", "icon", "icon_name"] + (list(KEYWORD_FIELDS) if full else [])
+        data = {"applications": {}, "folders": {}}
+        # one read transaction, so a concurrent discovery cannot show up half applied
+        db.execute("BEGIN")
+        try:
+            self.version = db.execute("PRAGMA data_version").fetchone()[0]
+            rows = db.execute(
+                f"SELECT {', '.join('a.' + c for c in columns)}, m.folder_id, o.sort_id FROM apps a"
+                " LEFT JOIN membership m ON m.app_id = a.id LEFT JOIN item_order o ON o.item_id = a.id")
+            for row in rows:
+                app = {field: decode_field(field, value) for field, value in zip(columns, row)}
+                app["folderId"], app["sortId"] = row[-2], row[-1]
+                data["applications"][app["id"]] = app
+            rows = db.execute("SELECT f.id, f.name, o.sort_id FROM folders f LEFT JOIN item_order o ON o.item_id = f.id")
+            for folder_id, name, sort_id in rows:
+                data["folders"][folder_id] = {"id": folder_id, "name": name, "appIds": [], "sortId": sort_id}
+            rows = db.execute("SELECT m.folder_id, m.app_id FROM membership m"
+                              " LEFT JOIN item_order o ON o.item_id = m.app_id ORDER BY o.sort_id")
+            for folder_id, app_id in rows:
+                if folder_id in data["folders"]:
+                    data["folders"][folder_id]["appIds"].append(app_id)
+            if not full:
+                keyword_index = {}
+                for token, app_id in db.execute("SELECT token, app_id FROM keywords ORDER BY token, app_id"):
+                    keyword_index.setdefault(token, []).append(app_id)
+                data["keywordIndex"] = keyword_index
+        finally:
+            db.execute("COMMIT")
+
+        self.data = data
+        if not data["applications"] and not data["folders"]:
+            # Build initial data from desktop files on first run
+            apps = [new_app(app_info, i * ORDER_GAP) for i, app_info in enumerate(self.scan_desktop_files())]
+            if apps:
+                self.save_apps(apps)
+                return self.load(full)
+        return data
+
+    def _write_app(self, db, app):
+        fields = ("id", "name", "exec", "icon", "icon_name") + KEYWORD_FIELDS
+        db.execute(f"INSERT OR REPLACE INTO apps ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+                   [encode_field(field, app.get(field)) for field in fields])
+        db.execute("DELETE FROM keywords WHERE app_id = ?", (app["id"],))
+        db.executemany("INSERT INTO keywords (token, app_id) VALUES (?, ?)",
+                       [(token, app["id"]) for token in keyword_tokens(app)])
+        self._write_position(db, app)
+
+    def _write_folder(self, db, folder):
+        db.execute("INSERT OR REPLACE INTO folders (id, name) VALUES (?, ?)", (folder["id"], folder["name"]))
+        db.execute("INSERT OR REPLACE INTO item_order (item_id, sort_id) VALUES (?, ?)",
+                   (folder["id"], folder["sortId"]))
+
+    def _write_position(self, db, app):
+        """Store which folder an app is in and where"""
+        if app.get("folderId"):
+            db.execute("INSERT OR REPLACE INTO membership (app_id, folder_id) VALUES (?, ?)",
+                       (app["id"], app["folderId"]))
+        else:
+            db.execute("DELETE FROM membership WHERE app_id = ?", (app["id"],))
+        db.execute("INSERT OR REPLACE INTO item_order (item_id, sort_id) VALUES (?, ?)", (app["id"], app["sortId"]))
+
+    def save_apps(self, apps=(), removed=()):
+        """Store whole app records (discovery) and delete the removed app ids, in one transaction"""
+        with self.transaction() as db:
+            for app in apps:
+                self._write_app(db, app)
+            for app_id in removed:
+                for table, column in (("apps", "id"), ("keywords", "app_id"), ("membership", "app_id"),
+                                      ("item_order", "item_id")):
+                    db.execute(f"DELETE FROM {table} WHERE {column} = ?", (app_id,))
+
+    def save_layout(self, items, removed_folders=()):
+        """Store the folder, membership and order of the given apps and folders of self.data.
+
+        Only layout columns are written, so this is safe on a catalog
+        loaded without the keyword fields.
+        """
+        with self.transaction() as db:
+            for item in items:
+                if item["id"] in self.data["folders"]:
+                    self._write_folder(db, item)
+                else:
+                    self._write_position(db, item)
+            for folder_id in removed_folders:
+                db.execute("DELETE FROM folders WHERE id = ?", (folder_id,))
+                db.execute("DELETE FROM item_order WHERE item_id = ?", (folder_id,))
+                db.execute("DELETE FROM membership WHERE folder_id = ?", (folder_id,))
+
+    def save_icons(self, apps):
+        with self.transaction() as db:
+            db.executemany("UPDATE apps SET icon = ?, icon_name = ? WHERE id = ?",
+                           [(app.get("icon"), app.get("icon_name"), app["id"]) for app in apps])
+
+    def max_sort_id(self):
+        """Finds the maximum sortId across all apps and folders in the current data."""
+        max_id = -1
+        for items in (self.data.get("applications", {}), self.data.get("folders", {})):
+            for item in items.values():
+                sort_id = item.get("sortId")
+                if isinstance(sort_id, int):
+                    max_id = max(max_id, sort_id)
+        return max_id
+
+    def scan_desktop_files(self):
+        """Scans system and user desktop files and returns a list of parsed app_info dicts."""
+        found_apps = []
+        # Use a key (name and exec command) for robust de-duplication across directories
+        seen_keys = set()
+        # The shared catalog only re-parses desktop files whose mtime changed
+        for entry in get_catalog().scan():
+            app_info = app_info_from_entry(entry)
+            if app_info:
+                app_key = (app_info["name"], app_info["exec"])
+                if app_key not in seen_keys:
+                    found_apps.append(app_info)
+                    seen_keys.add(app_key)
+        return found_apps
+
+    def resolve_missing_icons(self):
+        # Resolve missing icon paths: prefer find_icon(icon_name) then leave icon_name for QIcon.fromTheme fallback
+        updated = []
+        for app in self.data.get("applications", {}).values():
+            icon_path = app.get("icon")
+            icon_name = app.get("icon_name")
+            if icon_path and os.path.exists(icon_path):
+                continue
+            resolved = None
+            if icon_name:
+                resolved = find_icon(icon_name)
+            if not resolved and icon_path:
+                # maybe icon_path was actually an icon basename (with ext or without)
+                base = os.path.splitext(os.path.basename(icon_path))[0]
+                resolved = find_icon(base)
+                if not icon_name:
+                    app["icon_name"] = base
+            if resolved:
+                app["icon"] = resolved
+                updated.append(app)
+        if updated:
+            # save resolved paths back to the catalog
+            self.save_icons(updated)
+        return bool(updated)
+
+    def discover(self):
+        """Scans for new desktop files, identifies removed ones, updates the data, and saves."""
+        # 1. Get all currently found desktop files on the system
+        found_apps = self.scan_desktop_files()
+        found_app_keys = {(app["name"], app["exec"]) for app in found_apps}
+
+        # 2. Map the (name, exec) of every managed application to its ID
+        managed_apps = self.data["applications"]
+        managed_app_keys = {(app["name"], app["exec"]): app_id
+                            for app_id, app in managed_apps.items() if app.get("exec")}
+
+        changed = {}
+
+        # --- REMOVAL LOGIC: applications whose desktop file is gone ---
+        removed = [app_id for app_key, app_id in managed_app_keys.items() if app_key not in found_app_keys]
+        for app_id in removed:
+            del managed_apps[app_id]
+        if removed:
+            print(f"Discovery mode: Removed {len(removed)} applications (no corresponding desktop file found).")
+
+        # the first managed app of each name is the one found apps update
+        managed_by_name = {}
+        for app in managed_apps.values():
+            managed_by_name.setdefault(app["name"], app)
+
+        # --- UPDATE LOGIC: Update exec and keyword fields for existing applications ---
+        update_count = 0
+        keyword_update_count = 0
+        for app_info in found_apps:
+            app_data = managed_by_name.get(app_info["name"])
+            if app_data is None:
+                continue
+            if app_data["exec"] != app_info["exec"]:
+                app_data["exec"] = app_info["exec"]
+                changed[app_data["id"]] = app_data
+                update_count += 1
+            if any(app_data.get(field) != app_info[field] for field in KEYWORD_FIELDS):
+                for field in KEYWORD_FIELDS:
+                    app_data[field] = app_info[field]
+                changed[app_data["id"]] = app_data
+                keyword_update_count += 1
+        if update_count > 0:
+            print(f"Discovery mode: Updated {update_count} applications to use .desktop filenames.")
+        if keyword_update_count > 0:
+            print(f"Discovery mode: Updated search keywords of {keyword_update_count} applications.")
+
+        # --- ICON RE-RESOLUTION: Update to larger icons ---
+        icon_update_count = 0
+        for app_data in managed_apps.values():
+            icon_name = app_data.get("icon_name")
+            if icon_name:
+                new_icon = find_icon(icon_name)
+                if new_icon and new_icon != app_data.get("icon"):
+                    app_data["icon"] = new_icon
+                    changed[app_data["id"]] = app_data
+                    icon_update_count += 1
+        if icon_update_count > 0:
+            print(f"Discovery mode: Updated {icon_update_count} application icons to larger sizes.")
+
+        # --- ADDITION LOGIC: Identify and add new applications ---
+        added_count = 0
+        current_sort_id = self.max_sort_id() + ORDER_GAP
+        for app_info in found_apps:
+            if app_info["name"] in managed_by_name:
+                continue
+            app = new_app(app_info, current_sort_id)
+            managed_apps[app["id"]] = app
+            managed_by_name[app["name"]] = app
+            changed[app["id"]] = app
+            current_sort_id += ORDER_GAP
+            added_count += 1
+        if added_count > 0:
+            print(f"Discovery mode: Found and added {added_count} new applications.")
+
+        if changed or removed:
+            # only the rows of these apps are written
+            self.save_apps(changed.values(), removed)
+            return True
+        print("Discovery mode: No changes to applications list.")
+        return False
+
+    def apply_changes(self, changes):
+        """Update the catalog for a list of (desktop file path, event) pairs and save it.
+
+        The event only says what the watcher saw; the file system decides:
+        a desktop id that no directory provides anymore is removed, any
+        other one is (re-)read from the first directory that has it.
+        """
+        apps = self.data["applications"]
+        by_exec = {}
+        by_name = {}
+        for app_id, app in apps.items():
+            by_exec.setdefault(app.get("exec"), app_id)
+            by_name.setdefault(app["name"], app_id)
+
+        changed = {}
+        removed = []
+        next_sort_id = None
+        for path, event in changes:
+            desktop_id = os.path.basename(path)
+            if not desktop_id.endswith(".desktop"):
+                continue
+            app_info = None
+            if event not in REMOVE_EVENTS or os.path.exists(path):
+                app_info = app_info_from_entry(get_catalog().get_path(path))
+            if app_info is None:
+                # another directory may still provide this desktop id
+                other = get_catalog().find(desktop_id)
+                if other and other != path:
+                    app_info = app_info_from_entry(get_catalog().get_path(other))
+
+            app_id = by_exec.get(desktop_id)
+            if app_info is None:
+                if app_id is not None:
+                    app = apps.pop(app_id)
+                    changed.pop(app_id, None)
+                    removed.append(app_id)
+                    del by_exec[desktop_id]
+                    if by_name.get(app["name"]) == app_id:
+                        del by_name[app["name"]]
+                    print(f"Discovery mode: Removed {app['name']}.")
+                continue
+
+            if app_id is None:
+                app_id = by_name.get(app_info["name"])
+            if app_id is None:
+                if next_sort_id is None:
+                    next_sort_id = self.max_sort_id() + ORDER_GAP
+                app = new_app(app_info, next_sort_id)
+                next_sort_id += ORDER_GAP
+                apps[app["id"]] = changed[app["id"]] = app
+                by_exec[app["exec"]] = app["id"]
+                by_name[app["name"]] = app["id"]
+                print(f"Discovery mode: Added {app['name']}.")
+                continue
+
+            app = apps[app_id]
+            fields = ("name", "exec", "icon", "icon_name") + KEYWORD_FIELDS
+            if all(app.get(field) == app_info[field] for field in fields):
+                continue
+            if by_exec.get(app.get("exec")) == app_id:
+                del by_exec[app["exec"]]
+            for field in fields:
+                app[field] = app_info[field]
+            by_exec[app["exec"]] = app_id
+            by_name.setdefault(app["name"], app_id)
+            changed[app_id] = app
+            print(f"Discovery mode: Updated {app['name']}.")
+
+        if changed or removed:
+            self.save_apps(changed.values(), removed)
+            return True
+        print("Discovery mode: No changes to applications list.")
+        return False
+
+
+def discover_main(args):
+    """Run 'ylauncher -d [--changed FILE [--event EVENT]]...'; returns the exit status"""
+    changes = []
+    i = 0
+    while i < len(args):
+        if args[i] == "--changed" and i + 1 < len(args):
+            changes.append([args[i + 1], None])
+            i += 2
+        elif args[i] == "--event" and i + 1 < len(args):
+            if changes:
+                changes[-1][1] = args[i + 1]
+            i += 2
+        else:
+            i += 1
+
+    catalog = LauncherCatalog()
+    try:
+        # discovery compares the keyword fields, the launcher never needs them
+        catalog.load(full=True)
+        if changes:
+            catalog.apply_changes(changes)
+        else:
+            catalog.discover()
+    except sqlite3.Error as e:
+        print(f"Discovery mode: Could not update the catalog: {e}", file=sys.stderr)
+        return 1
+    return 0
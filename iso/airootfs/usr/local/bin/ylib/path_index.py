@@ -0,0 +1,398 @@
+"""
+Persistent trigram index of file paths for ylauncher's file search.
+
+Entries are stored as a parent-id array plus one base name each, so a
+path costs one string however deep it is. Every base name is broken into
+case-folded trigrams and each trigram maps to an array('I') of entry
+ids; a query only walks the array of its rarest trigram, checking names
+until it has enough matches, instead of scanning every path.
+
+PathIndexer (run by the resident launcher) rebuilds the index on a
+low-priority thread, then follows inotify events to keep it current and
+writes it to ~/.cache/younix/path-index.bin a while after the last
+change. Removed entries are only marked dead (their descendants with
+them) and dropped the next time the index is rebuilt.
+
+Which directories are indexed is read from ~/.config/ylauncher/file-search.json:
+    {"include": ["~"], "exclude": ["~/.cache", ...], "hidden": false}
+"""
+import errno
+import os
+import select
+import struct
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from ylib.cache import cache_path, load_json
+from ylib.inotify import (Inotify, IN_CREATE, IN_DELETE, IN_MOVED_FROM, IN_MOVED_TO,
+                          IN_ONLYDIR, IN_ISDIR, IN_IGNORED, IN_Q_OVERFLOW)
+
+CONFIG_FILE = Path.home() / ".config" / "ylauncher" / "file-search.json"
+DEFAULT_CONFIG = {
+    "include": ["~"],
+    "exclude": ["~/.cache", "~/.local/share/Trash", "~/.npm", "~/.cargo", "~/.rustup", "~/go/pkg"],
+    "hidden": False,
+}
+
+INDEX_FILE = cache_path("path-index.bin")
+INDEX_MAGIC = b"YPIX"
+INDEX_VERSION = 1
+# magic, version, entries, name bytes, trigrams, posting ids
+INDEX_HEADER = struct.Struct("<4sIIQIQ")
+
+MIN_QUERY = 3
+SCAN_FACTOR = 4  # verified matches collected per returned result before ranking
+SAVE_DELAY = 60  # seconds after the last change before the index is written
+MAX_SAVE_DELAY = 600  # write anyway when changes keep coming for this long
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+
+
+def load_config():
+    """Return the file search config with ~ expanded and paths normalized"""
+    config = dict(DEFAULT_CONFIG)
+    data = load_json(CONFIG_FILE)
+    if isinstance(data, dict):
+        config.update(data)
+    normalize = lambda p: os.path.normpath(os.path.expanduser(p))
+    config["include"] = [normalize(p) for p in config["include"]]
+    config["exclude"] = {normalize(p) for p in config["exclude"]}
+    return config
+
+
+def trigrams(text):
+    """Return the trigrams of folded text, each packed into one int"""
+    codes = [ord(c) for c in text]
+    return {(codes[i] << 42) | (codes[i + 1] << 21) | codes[i + 2] for i in range(len(codes) - 2)}
+
+
+class PathIndex:
+    def __init__(self):
+        self.names = []            # base name per entry; roots hold their full path, dead entries None
+        self.parents = array('i')  # parent entry id, -1 for roots
+        self.postings = {}         # trigram -> array('I') of entry ids, ascending
+        self.dead = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names) - self.dead
+
+    def add_root(self, path):
+        with self.lock:
+            self.names.append(path)
+            self.parents.append(-1)
+            return len(self.names) - 1
+
+    def add(self, parent, name):
+        with self.lock:
+            entry = len(self.names)
+            self.names.append(name)
+            self.parents.append(parent)
+            for trigram in trigrams(name.casefold()):
+                ids = self.postings.get(trigram)
+                if ids is None:
+                    ids = self.postings[trigram] = array('I')
+                ids.append(entry)
+            return entry
+
+    def remove(self, entry):
+        with self.lock:
+            if self.names[entry] is not None:
+                self.names[entry] = None
+                self.dead += 1
+
+    def find_child(self, parent, name):
+        """Return the live entry called name in directory parent, or None"""
+        with self.lock:
+            grams = trigrams(name.casefold())
+            if grams:
+                candidates = min((self.postings.get(g, ()) for g in grams), key=len)
+            else:
+                # names under three characters have no trigrams to look up
+                candidates = range(len(self.names))
+            for entry in candidates:
+                if self.parents[entry] == parent and self.names[entry] == name:
+                    return entry
+        return None
+
+    def path(self, entry):
+        """Return the full path of an entry, or None if it or a parent was removed"""
+        parts = []
+        while entry >= 0:
+            name = self.names[entry]
+            if name is None:
+                return None
+            parts.append(name)
+            entry = self.parents[entry]
+        return os.path.join(*reversed(parts))
+
+    def search(self, query, limit=50):
+        """Return up to limit paths whose base name contains every word of query"""
+        words = query.casefold().split()
+        if not words or max(len(w) for w in words) < MIN_QUERY:
+            return []
+        with self.lock:
+            candidates = None
+            for word in words:
+                for trigram in trigrams(word):
+                    ids = self.postings.get(trigram)
+                    if ids is None:
+                        return []
+                    if candidates is None or len(ids) < len(candidates):
+                        candidates = ids
+
+            # checking names is as cheap as probing the other arrays and can stop early
+            found = []
+            for entry in candidates:
+                name = self.names[entry]
+                if name is None:
+                    continue
+                folded = name.casefold()
+                if all(word in folded for word in words):
+                    found.append((not folded.startswith(words[0]), len(name), entry))
+                    if len(found) >= limit * SCAN_FACTOR:
+                        break
+            found.sort()
+            paths = []
+            for _, _, entry in found:
+                path = self.path(entry)
+                if path:
+                    paths.append(path)
+                    if len(paths) == limit:
+                        break
+        return paths
+
+    def replace(self, other):
+        """Take over the contents of a freshly built index"""
+        with self.lock:
+            self.names, self.parents = other.names, other.parents
+            self.postings, self.dead = other.postings, other.dead
+
+    def save(self, path=INDEX_FILE):
+        """Write the index atomically; dead entries are kept as empty names"""
+        path = Path(path)
+        with self.lock:
+            names = "\0".join(name or "" for name in self.names).encode('utf-8', 'surrogateescape')
+            keys = array('Q', self.postings)
+            counts = array('I', (len(ids) for ids in self.postings.values()))
+            parents = self.parents.tobytes()
+            chunks = [ids.tobytes() for ids in self.postings.values()]
+            header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(self.names), len(names),
+                                       len(keys), sum(counts))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                f.write(parents)
+                f.write(names)
+                f.write(keys.tobytes())
+                f.write(counts.tobytes())
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            return False
+
+    def load(self, path=INDEX_FILE):
+        """Read a saved index into an empty one; returns False if it is missing or stale"""
+        try:
+            with open(path, 'rb') as f:
+                magic, version, entries, names_len, key_count, id_count = INDEX_HEADER.unpack(
+                    f.read(INDEX_HEADER.size))
+                if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                    return False
+                parents = array('i')
+                parents.frombytes(f.read(entries * parents.itemsize))
+                names = f.read(names_len).decode('utf-8', 'surrogateescape').split("\0") if entries else []
+                keys = array('Q')
+                keys.frombytes(f.read(key_count * keys.itemsize))
+                counts = array('I')
+                counts.frombytes(f.read(key_count * counts.itemsize))
+                ids = array('I')
+                ids.frombytes(f.read(id_count * ids.itemsize))
+        except (OSError, struct.error, ValueError):
+            return False
+        if len(names) != entries or len(ids) != id_count:
+            return False
+
+        postings = {}
+        offset = 0
+        for key, count in zip(keys, counts):
+            postings[key] = ids[offset:offset + count]
+            offset += count
+        names = [name or None for name in names]
+        with self.lock:
+            if self.names:
+                # a rebuilt index got here first and is newer
+                return False
+            self.names, self.parents, self.postings = names, parents, postings
+            self.dead = names.count(None)
+        return True
+
+
+class PathIndexer:
+    """Build and maintain a PathIndex on a low-priority daemon thread"""
+
+    def __init__(self, index, config=None, path=INDEX_FILE):
+        self.index = index
+        self.config = config or load_config()
+        self.path = path
+        self.inotify = None
+        self.watches = {}  # watch descriptor -> directory entry id
+        self.watch_limit_reached = False
+        self.dirty_since = None
+        self.last_change = None
+        self.running = False
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def _run(self):
+        try:
+            # nice() only applies to this thread on Linux, the UI keeps its priority
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        try:
+            self.inotify = Inotify()
+        except OSError:
+            self.inotify = None
+        self.rebuild()
+        while self.running:
+            self._wait_for_events()
+
+    def rebuild(self):
+        """Scan every included root into a fresh index, then swap it in and save it"""
+        fresh = PathIndex()
+        for watch in list(self.watches):
+            self._remove_watch(watch)
+        self.watches = {}
+        # the old watches are gone, so there may be room for every directory again
+        self.watch_limit_reached = False
+        for root in self.config["include"]:
+            if os.path.isdir(root):
+                self._scan(fresh, fresh.add_root(root), root)
+        if not self.running:
+            return
+        self.index.replace(fresh)
+        self.index.save(self.path)
+        self.dirty_since = self.last_change = None
+
+    def _remove_watch(self, watch):
+        try:
+            self.inotify.rm_watch(watch)
+        except OSError:
+            pass
+
+    def _skip(self, name, path):
+        return (not self.config["hidden"] and name.startswith(".")) or path in self.config["exclude"]
+
+    def _watch(self, entry, path):
+        if self.inotify is None or self.watch_limit_reached:
+            return
+        try:
+            self.watches[self.inotify.add_watch(path, WATCH_MASK)] = entry
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                # fs.inotify.max_user_watches reached: the rest is only picked up by the next rebuild
+                self.watch_limit_reached = True
+                print("ylauncher: inotify watch limit reached, file search updates are partial")
+
+    def _scan(self, index, directory, path):
+        """Add everything below the directory entry at path"""
+        stack = [(directory, path)]
+        while stack and self.running:
+            directory, path = stack.pop()
+            # watch before listing so nothing created meanwhile is missed
+            self._watch(directory, path)
+            try:
+                entries = os.scandir(path)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if self._skip(entry.name, entry.path):
+                        continue
+                    child = index.add(directory, entry.name)
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((child, entry.path))
+                    except OSError:
+                        pass
+            # give way to the UI thread between directories
+            time.sleep(0)
+
+    def _wait_for_events(self):
+        if self.inotify is None:
+            time.sleep(SAVE_DELAY)
+            return
+        timeout = None
+        if self.dirty_since:
+            now = time.monotonic()
+            timeout = max(min(SAVE_DELAY - (now - self.last_change), MAX_SAVE_DELAY - (now - self.dirty_since)), 0)
+        ready, _, _ = select.select([self.inotify], [], [], timeout)
+        if ready:
+            for event in self.inotify.read():
+                self._apply(event)
+        if self.dirty_since:
+            now = time.monotonic()
+            if now - self.last_change >= SAVE_DELAY or now - self.dirty_since >= MAX_SAVE_DELAY:
+                self.index.save(self.path)
+                self.dirty_since = self.last_change = None
+
+    def _changed(self):
+        self.last_change = time.monotonic()
+        if self.dirty_since is None:
+            self.dirty_since = self.last_change
+
+    def _apply(self, event):
+        if event.mask & IN_Q_OVERFLOW:
+            # events were lost; only a full rescan is reliable
+            self.rebuild()
+            return
+        if event.mask & IN_IGNORED:
+            self.watches.pop(event.wd, None)
+            return
+        directory = self.watches.get(event.wd)
+        if directory is None or not event.name:
+            return
+        parent_path = self.index.path(directory)
+        if parent_path is None:
+            return
+        path = os.path.join(parent_path, event.name)
+
+        if event.mask & (IN_DELETE | IN_MOVED_FROM):
+            entry = self.index.find_child(directory, event.name)
+            if entry is not None:
+                self.index.remove(entry)
+                self._changed()
+        elif event.mask & (IN_CREATE | IN_MOVED_TO):
+            if self._skip(event.name, path) or self.index.find_child(directory, event.name) is not None:
+                return
+            entry = self.index.add(directory, event.name)
+            if event.mask & IN_ISDIR:
+                self._scan(self.index, entry, path)
+            self._changed()
+
+
+_default_index = None
+
+
+def get_path_index():
+    """Return the process-wide path index; the saved one is loaded in the background
+    and answers queries until PathIndexer has rebuilt it"""
+    global _default_index
+    if _default_index is None:
+        _default_index = PathIndex()
+        threading.Thread(target=_default_index.load, daemon=True).start()
+    return _default_index
@@ -0,0 +1,196 @@
+"""
+In-memory model of Hyprland windows and workspaces.
+
+Seeded from 'clients' / 'activeworkspace' / 'activewindow' whenever the
+event socket (re)connects and kept current purely from socket2 events, so consumers can ask which
+classes are running, which windows belong to an app or which workspace
+is active without another IPC round-trip.
+"""
+import json
+
+from ylib.hyprland import HyprlandError
+
+# What a change affects, returned by WindowModel.apply_event()
+WINDOWS_CHANGED = "windows"      # a window appeared, vanished or changed class
+WORKSPACE_CHANGED = "workspace"  # a window moved or the active workspace changed
+FOCUS_CHANGED = "focus"
+TITLE_CHANGED = "title"
+URGENT_CHANGED = "urgent"
+
+
+def normalize_address(address):
+    """Events send bare hex addresses, JSON replies prefix them with 0x"""
+    address = address.strip()
+    return address if address.startswith("0x") else "0x" + address
+
+
+class WindowModel:
+    def __init__(self):
+        self.windows = {}
+        self.workspace_ids = {}
+        self.active_workspace = {"id": 1, "name": "1"}
+        self.active_window = None
+
+    def seed(self, ipc):
+        """Load the full state once; afterwards only events update the model"""
+        try:
+            clients, workspaces, active_ws, active_win = ipc.batch(
+                ["j/clients", "j/workspaces", "j/activeworkspace", "j/activewindow"]
+            )
+            clients = json.loads(clients)
+            workspaces = json.loads(workspaces)
+            active_ws = json.loads(active_ws)
+            active_win = json.loads(active_win)
+        except (HyprlandError, ValueError):
+            return False
+
+        self.windows = {}
+        self.workspace_ids = {ws.get('name', ''): ws.get('id') for ws in workspaces if isinstance(ws, dict)}
+        for client in clients:
+            if not client.get('address'):
+                continue
+            workspace = client.get('workspace', {})
+            self.windows[client['address']] = {
+                'address': client['address'],
+                'class': client.get('class', ''),
+                'title': client.get('title', ''),
+                'workspace': workspace.get('id', 1),
+                'workspace_name': workspace.get('name', ''),
+                'urgent': False,
+            }
+        if isinstance(active_ws, dict) and 'id' in active_ws:
+            self.active_workspace = {"id": active_ws['id'], "name": active_ws.get('name', str(active_ws['id']))}
+        self.active_window = active_win.get('address') if isinstance(active_win, dict) else None
+        return True
+
+    def workspace_id(self, name):
+        """Map a workspace name from an event to its numeric id"""
+        if name in self.workspace_ids:
+            return self.workspace_ids[name]
+        try:
+            return int(name)
+        except ValueError:
+            return None
+
+    def apply_event(self, name, data):
+        """Apply one socket2 event; returns the set of things that changed"""
+        handler = getattr(self, "_on_" + name, None)
+        if handler is None:
+            return set()
+        try:
+            return handler(data) or set()
+        except (ValueError, IndexError):
+            return set()
+
+    def _on_openwindow(self, data):
+        # ADDRESS,WORKSPACENAME,WINDOWCLASS,WINDOWTITLE
+        address, workspace_name, window_class, title = data.split(',', 3)
+        address = normalize_address(address)
+        self.windows[address] = {
+            'address': address,
+            'class': window_class,
+            'title': title,
+            'workspace': self.workspace_id(workspace_name),
+            'workspace_name': workspace_name,
+            'urgent': False,
+        }
+        return {WINDOWS_CHANGED}
+
+    def _on_closewindow(self, data):
+        address = normalize_address(data)
+        if self.windows.pop(address, None) is None:
+            return set()
+        if self.active_window == address:
+            self.active_window = None
+        return {WINDOWS_CHANGED}
+
+    def _on_movewindow(self, data):
+        # ADDRESS,WORKSPACENAME
+        address, workspace_name = data.split(',', 1)
+        window = self.windows.get(normalize_address(address))
+        if not window:
+            return set()
+        window['workspace_name'] = workspace_name
+        window['workspace'] = self.workspace_id(workspace_name)
+        return {WORKSPACE_CHANGED}
+
+    def _on_movewindowv2(self, data):
+        # ADDRESS,WORKSPACEID,WORKSPACENAME
+        address, workspace_id, workspace_name = data.split(',', 2)
+        window = self.windows.get(normalize_address(address))
+        if not window:
+            return set()
+        window['workspace'] = int(workspace_id)
+        window['workspace_name'] = workspace_name
+        self.workspace_ids[workspace_name] = int(workspace_id)
+        return {WORKSPACE_CHANGED}
+
+    def _on_activewindowv2(self, data):
+        # ADDRESS (empty when nothing is focused)
+        address = normalize_address(data) if data.strip() else None
+        self.active_window = address
+        changed = {FOCUS_CHANGED}
+        window = self.windows.get(address)
+        if window and window['urgent']:
+            # focusing a window acknowledges its urgency hint
+            window['urgent'] = False
+            changed.add(URGENT_CHANGED)
+        return changed
+
+    def _on_activewindow(self, data):
+        # v1 only carries CLASS,TITLE; the address arrives with activewindowv2
+        return set()
+
+    def _on_windowtitlev2(self, data):
+        # ADDRESS,TITLE
+        address, title = data.split(',', 1)
+        window = self.windows.get(normalize_address(address))
+        if not window or window['title'] == title:
+            return set()
+        window['title'] = title
+        return {TITLE_CHANGED}
+
+    def _on_windowtitle(self, data):
+        # v1 only carries the address; the title arrives with windowtitlev2
+        return set()
+
+    def _on_urgent(self, data):
+        window = self.windows.get(normalize_address(data))
+        if not window or window['urgent'] or window['address'] == self.active_window:
+            return set()
+        window['urgent'] = True
+        return {URGENT_CHANGED}
+
+    def _on_workspacev2(self, data):
+        # WORKSPACEID,WORKSPACENAME
+        workspace_id, workspace_name = data.split(',', 1)
+        self.active_workspace = {"id": int(workspace_id), "name": workspace_name}
+        self.workspace_ids[workspace_name] = int(workspace_id)
+        return {WORKSPACE_CHANGED}
+
+    def _on_workspace(self, data):
+        workspace_id = self.workspace_id(data)
+        if workspace_id is None:
+            return set()
+        self.active_workspace = {"id": workspace_id, "name": data}
+        return {WORKSPACE_CHANGED}
+
+    def _on_focusedmon(self, data):
+        # MONNAME,WORKSPACENAME
+        return self._on_workspace(data.split(',', 1)[1])
+
+    def _on_createworkspacev2(self, data):
+        workspace_id, workspace_name = data.split(',', 1)
+        self.workspace_ids[workspace_name] = int(workspace_id)
+        return set()
+
+    def _on_destroyworkspacev2(self, data):
+        workspace_id, workspace_name = data.split(',', 1)
+        self.workspace_ids.pop(workspace_name, None)
+        return set()
+
+    def running_classes(self):
+        return {w['class'] for w in self.windows.values() if w['class']}
+
+    def urgent_classes(self):
+        return {w['class'] for w in self.windows.values() if w['urgent'] and w['class']}
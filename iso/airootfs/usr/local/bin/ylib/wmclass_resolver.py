@@ -0,0 +1,117 @@
+"""
+Window class -> desktop file resolver.
+
+Builds exact lookup maps (StartupWMClass, desktop file stem, Exec
+basename) from the desktop catalog once, so resolving a running window
+class is a dict lookup instead of reading every desktop file. The
+substring / shortest-stem fallback keeps the old matching rules and its
+answers are memoized per class until a desktop file changes.
+"""
+import os
+
+from ylib.desktop_catalog import get_catalog
+
+# Files clearly marked as utilities/actions based on file name
+SKIP_SUFFIXES = ('-settings', '-preferences', '-bulk-rename', '-action')
+
+
+def exec_basename(exec_cmd):
+    """Return the lower-cased executable name of an Exec line"""
+    if not exec_cmd or not exec_cmd.split():
+        return ''
+    return os.path.basename(exec_cmd.split()[0]).lower()
+
+
+class WMClassResolver:
+    def __init__(self, catalog=None):
+        self.catalog = catalog or get_catalog()
+        # path -> (order, desktop id, stem, wm class, exec name)
+        self.records = {}
+        self._order = 0
+        self.strict = {}
+        self.by_exec = {}
+        self.stems = []
+        self.fallback = {}
+
+    def _record(self, entry):
+        desktop_id = entry['id']
+        stem = desktop_id[:-len('.desktop')].lower() if desktop_id.endswith('.desktop') else desktop_id.lower()
+        if stem.endswith(SKIP_SUFFIXES):
+            return None
+        self._order += 1
+        return (self._order, desktop_id, stem, entry['startup_wm_class'].lower(), exec_basename(entry['exec']))
+
+    def rebuild(self):
+        """Index every desktop file in the catalog directories"""
+        self.records = {}
+        self._order = 0
+        for entry in self.catalog.scan():
+            record = self._record(entry)
+            if record:
+                self.records[entry['path']] = record
+        self._rebuild_maps()
+
+    def _rebuild_maps(self):
+        strict = {}
+        by_exec = {}
+        records = sorted(self.records.values())
+        for order, desktop_id, stem, wm_class, exec_name in records:
+            # the first file matching either its StartupWMClass or its stem wins
+            if wm_class:
+                strict.setdefault(wm_class, desktop_id)
+            strict.setdefault(stem, desktop_id)
+            if exec_name:
+                by_exec.setdefault(exec_name, []).append((len(stem), order, desktop_id))
+        self.strict = strict
+        self.by_exec = {name: min(candidates) for name, candidates in by_exec.items()}
+        # shortest stems first, file order on ties, so the first substring hit is the best one
+        self.stems = sorted((len(stem), order, stem, desktop_id) for order, desktop_id, stem, _, _ in records)
+        self.fallback = {}
+
+    def update(self, path):
+        """Re-index one desktop file after it was created or changed"""
+        path = str(path)
+        entry = self.catalog.get_path(path) if path.endswith('.desktop') else None
+        record = self._record(entry) if entry else None
+        if record:
+            old = self.records.get(path)
+            if old:
+                # keep the original position so matches stay stable across edits
+                record = (old[0],) + record[1:]
+            self.records[path] = record
+        elif path not in self.records:
+            return
+        else:
+            del self.records[path]
+        self._rebuild_maps()
+
+    def remove(self, path):
+        """Drop one desktop file from the index after it was deleted"""
+        if self.records.pop(str(path), None) is not None:
+            self._rebuild_maps()
+
+    def resolve(self, class_name):
+        """Return the desktop file name for a window class, or None"""
+        if not class_name:
+            return None
+        class_name = class_name.lower()
+
+        desktop_id = self.strict.get(class_name)
+        if desktop_id:
+            return desktop_id
+
+        if class_name in self.fallback:
+            return self.fallback[class_name]
+
+        best = None
+        for length, order, stem, candidate_id in self.stems:
+            if class_name in stem or stem in class_name:
+                best = (length, order, candidate_id)
+                break
+        exec_match = self.by_exec.get(class_name)
+        if exec_match and (best is None or exec_match < best):
+            best = exec_match
+
+        desktop_id = best[2] if best else None
+        self.fallback[class_name] = desktop_id
+        return desktop_id
@@ -2,6 +2,7 @@
 import sys
 import os
 import subprocess
+import threading
 from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton, QMenu, QSizePolicy, QScrollArea
 from PyQt6.QtCore import Qt, QTimer, QSize, QPoint, QPointF
 from PyQt6.QtGui import QIcon, QPainter, QPen, QColor, QMouseEvent
@@ -9,6 +10,10 @@ from PyQt6.QtNetwork import QLocalServer, QLocalSocket
 from plugin_manager import load_plugins, get_size_span, PluginSize, clear_plugin_cache
 from config import Config
 
+# Shared YoUNiX helpers live next to this package (ylib/)
+sys.path.insert(1, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ylib.hyprland import get_ipc, HyprlandError
+
 class OverlayWidget(QWidget):
     def __init__(self, control_center, parent=None):
         super().__init__(parent)
@@ -602,14 +607,15 @@ class ControlCenter(QWidget):
         QTimer.singleShot(50, self.force_hyprland_move)
     
     def force_hyprland_move(self):
-        try:
-            # Note: We use 'exact' to bypass any relative positioning
-            subprocess.Popen([
-                "hyprctl", "dispatch", "movewindowpixel", 
-                "exact 10 45,title:^YoUNiXButtons$"
-            ])
-        except Exception as e:
-            print(f"Failed to move window: {e}")
+        def move():
+            try:
+                # Note: We use 'exact' to bypass any relative positioning
+                get_ipc().dispatch("movewindowpixel", "exact 10 45,title:^YoUNiXButtons$")
+            except HyprlandError as e:
+                print(f"Failed to move window: {e}")
+
+        # fire and forget, like the hyprctl call it replaces: a slow compositor must not block the GUI thread
+        threading.Thread(target=move, daemon=True).start()
             
     def setup_grid_layout(self, grid):
         # Set fixed 48x48 base cell size
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# ylib lives next to the scripts that use it
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "iso", "airootfs", "usr", "local", "bin"))
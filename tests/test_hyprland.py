@@ -0,0 +1,122 @@
+import time
+
+import pytest
+
+from ylib.fake_hyprland import FakeHyprland
+from ylib.hyprland import Event, EventReader, HyprlandIPC, HyprlandError
+
+
+@pytest.fixture
+def hypr():
+    with FakeHyprland() as instance:
+        yield instance
+
+
+def test_query_round_trip(hypr):
+    hypr.clients.append({"address": "0x1", "class": "foot"})
+    ipc = HyprlandIPC(hypr.request_path)
+    assert ipc.clients() == [{"address": "0x1", "class": "foot"}]
+    assert hypr.requests == ["j/clients"]
+
+
+def test_dispatch(hypr):
+    ipc = HyprlandIPC(hypr.request_path)
+    assert ipc.dispatch("focuswindow", "address:0x1")
+    assert hypr.dispatched == ["focuswindow address:0x1"]
+
+
+def test_batch_reply_split(hypr):
+    hypr.active_workspace = {"id": 2, "name": "2"}
+    ipc = HyprlandIPC(hypr.request_path)
+    replies = ipc.batch(["j/activeworkspace", "dispatch workspace 3", "j/workspaces"])
+    assert len(replies) == 3
+    assert replies[0] == '{"id": 2, "name": "2"}'
+    assert replies[1] == "ok"
+    assert replies[2] == '[{"id": 1, "name": "1"}]'
+    assert hypr.requests == ["[[BATCH]]j/activeworkspace;dispatch workspace 3;j/workspaces"]
+
+
+def test_request_timeout(hypr):
+    hypr.stalled = True
+    ipc = HyprlandIPC(hypr.request_path, timeout=0.2)
+    start = time.monotonic()
+    with pytest.raises(HyprlandError):
+        ipc.query("clients")
+    assert time.monotonic() - start < 2
+
+
+class Collector:
+    """EventReader callbacks that record what arrives"""
+
+    def __init__(self):
+        self.events = []
+        self.connects = 0
+
+    def deliver(self, events):
+        self.events.extend(events)
+
+    def on_connect(self):
+        self.connects += 1
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def start_reader(hypr, collector):
+    reader = EventReader(collector.deliver, on_connect=collector.on_connect, path=hypr.event_path).start()
+    assert wait_for(lambda: hypr.event_clients)
+    return reader
+
+
+def test_event_line_split_across_chunks(hypr):
+    collector = Collector()
+    reader = start_reader(hypr, collector)
+    try:
+        hypr.emit_raw(b"openwindow>>1,1,foot,Ter")
+        time.sleep(0.1)
+        assert collector.events == []
+        sent = time.monotonic()
+        hypr.emit_raw(b"minal, a title\nclosewindow>>1\n")
+        assert wait_for(lambda: len(collector.events) == 2)
+        event = collector.events[0]
+        assert event == Event("openwindow", "1,1,foot,Terminal, a title",
+                              ("1", "1", "foot", "Terminal, a title"), event.received)
+        # stamped when the completing chunk was read, not when the line was delivered
+        assert sent <= event.received <= time.monotonic()
+        assert collector.events[1].name == "closewindow"
+    finally:
+        reader.stop()
+
+
+def test_reconnect_after_server_closes(hypr):
+    collector = Collector()
+    reader = start_reader(hypr, collector)
+    try:
+        hypr.emit("workspace>>1")
+        assert wait_for(lambda: len(collector.events) == 1)
+        hypr.disconnect_events()
+        assert wait_for(lambda: hypr.event_clients)
+        assert wait_for(lambda: collector.connects == 2)
+        hypr.emit("workspace>>2")
+        assert wait_for(lambda: len(collector.events) == 2)
+        assert collector.events[1].args == ("2",)
+    finally:
+        reader.stop()
+
+
+def test_backoff_when_connections_close_at_once(hypr):
+    hypr.drop_events = True
+    collector = Collector()
+    reader = EventReader(collector.deliver, on_connect=collector.on_connect, path=hypr.event_path).start()
+    try:
+        time.sleep(1.0)
+    finally:
+        reader.stop()
+    # 0.25 + 0.5 s of backoff: a handful of attempts, not a busy loop
+    assert 1 <= hypr.event_connections <= 4